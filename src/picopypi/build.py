@@ -14,6 +14,9 @@ class Abi(enum.StrEnum):
     CP314 = "cp314"
     CP314T = "cp314t"
 
+    def __init__(self, /, *_):
+        self._parts = self.parts()
+
     def parts(self, /):
         minor = self.value[3:]
         special = ""
@@ -25,7 +28,7 @@ class Abi(enum.StrEnum):
     def __lt__(self, other, /):
         if not isinstance(other, type(self)):
             return NotImplemented
-        return self.parts() < other.parts()
+        return self._parts < other._parts
 
     def __eq__(self, other, /):
         if not isinstance(other, type(self)):
@@ -41,16 +44,10 @@ class Target(enum.StrEnum):
     MACOS = "macosx_universal2"
 
     def arch(self, /):
-        return {
-            self.MANYLINUX_ARM7: "armv7l",
-            self.MACOS: "universal2",
-        }[self]
+        return _TARGET_ARCHS[self]
 
     def platform(self, /):
-        return {
-            self.MANYLINUX_ARM7: "linux",
-            self.MACOS: "macos",
-        }[self]
+        return _TARGET_PLATFORMS[self]
 
     def native(self, /):
         return platform.system().lower() == self.platform()
@@ -60,4 +57,13 @@ class Target(enum.StrEnum):
             yield f"{abi}-{self.value}"
 
 
-DEFAULT_ABIS = [abi for abi in Abi if not abi.value.endswith(("t", "m"))]
+_TARGET_ARCHS = {
+    Target.MANYLINUX_ARM7: "armv7l",
+    Target.MACOS: "universal2",
+}
+_TARGET_PLATFORMS = {
+    Target.MANYLINUX_ARM7: "linux",
+    Target.MACOS: "macos",
+}
+
+DEFAULT_ABIS = tuple(abi for abi in Abi if not abi._parts[3])
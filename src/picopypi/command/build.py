@@ -7,11 +7,16 @@ from __future__ import annotations
 
 import argparse
 import collections.abc
-import dataclasses
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
 import itertools
 import pathlib
 import re
+import sys
 import tomllib
+import typing
 
 import packaging.version
 
@@ -28,6 +33,11 @@ def configure_parser(parser: argparse.ArgumentParser):
         action="store_true",
         help="only check what would be built, do not perform the actual build",
     )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="check the release assets even if the builds file was satisfied before",
+    )
     parser.add_argument(
         "--repository",
         type=picopypi.gitutil.repository,
@@ -55,14 +65,35 @@ def configure_parser(parser: argparse.ArgumentParser):
 
 def run(args: argparse.Namespace):
     repository = args.repository or picopypi.gitutil.infer_repository()
-    releases = picopypi.releases.load_from_github_api(repository)
+    build_data = args.builds.read_bytes()
+    marker = satisfied_marker(repository, build_data)
+    if not args.refresh and marker.exists():
+        print("Nothing to build! (builds file unchanged since last check)")
+        return
 
-    builds = gather_build_infos(releases, args.builds)
+    releases = picopypi.releases.load_from_github_api(repository)
+    output = args.output_dir.resolve()
+    # Wheels left over from a previous run do not need to be built again
+    local = picopypi.releases.load_from_directory(output)
+    built = list(supported_wheels(itertools.chain(*local.values())))
+    if built:
+        print(f"Found previously built wheels in {output}")
+
+    wheels = itertools.chain(*releases.values(), built)
+    builds = gather_build_infos(wheels, build_data)
     groups = list(group_builds(builds))
     if not groups:
         print("Nothing to build!")
+        # Wheels only present locally may still need to be uploaded
+        if not built:
+            with contextlib.suppress(OSError):
+                marker.parent.mkdir(parents=True, exist_ok=True)
+                marker.touch()
         return
 
+    with contextlib.suppress(OSError):
+        marker.unlink(missing_ok=True)
+
     targets = [
         build_pass.target
         for group in groups
@@ -78,15 +109,16 @@ def run(args: argparse.Namespace):
     print(f"Build passes to be performed: {native_targets} / {targetss}")
     repos = args.repo_dir.resolve()
     source = pathlib.Path()
-    output = args.output_dir.resolve()
+    sources: dict[str, pathlib.Path] = {}
     if not args.dry_run:
         picopypi.gitutil.create_ignored_folder(repos)
         picopypi.gitutil.create_ignored_folder(output)
+        sources = fetch_repositories(repos, (group.repository for group in groups))
 
     for group in groups:
         print(f"Building {group.package}")
         if not args.dry_run:
-            source = picopypi.gitutil.clone_or_fetch(repos, group.repository)
+            source = sources[group.repository]
 
         for build in group.builds:
             print(f"=> Building {build.version} ({build.revision})")
@@ -112,75 +144,77 @@ def run(args: argparse.Namespace):
                     )
 
 
-@dataclasses.dataclass(slots=True)
-class BuildGroup:
+def satisfied_marker(repository: str, build_data: bytes):
+    digest = hashlib.sha256(repository.encode())
+    digest.update(b"\0")
+    digest.update(build_data)
+    return picopypi.releases.cache_dir() / "satisfied" / digest.hexdigest()
+
+
+def fetch_repositories(path: pathlib.Path, urls: collections.abc.Iterable[str]):
+    # Repositories are independent, so fetch them concurrently; building
+    # stays sequential since it checks out revisions in the working tree
+    urls = list(dict.fromkeys(urls))
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        git_dirs = executor.map(
+            functools.partial(picopypi.gitutil.clone_or_fetch, path),
+            urls,
+        )
+        return dict(zip(urls, git_dirs, strict=True))
+
+
+class BuildGroup(typing.NamedTuple):
     package: str
     repository: str
 
     builds: list[Build]
 
 
-@dataclasses.dataclass(slots=True)
-class Build:
+class Build(typing.NamedTuple):
     version: packaging.version.Version
     revision: str
     passes: list[BuildPass]
 
 
-@dataclasses.dataclass(slots=True)
-class BuildPass:
+class BuildPass(typing.NamedTuple):
     target: picopypi.build.Target
     abis: list[picopypi.build.Abi]
     lockfile: str
 
 
 def group_builds(build_infos: collections.abc.Iterable[BuildInfo]):
-    def build_group_key(build_info: BuildInfo):
-        return build_info.package, build_info.repository
-
-    def build_key(build_info: BuildInfo):
-        return build_info.version, build_info.revision, build_info.lockfile
-
-    def pass_key(build_info: BuildInfo):
-        return build_info.target
-
-    def sort_key(build_info: BuildInfo):
-        return (
-            build_group_key(build_info)
-            + build_key(build_info)
-            + (pass_key(build_info),)
+    grouped: dict[
+        tuple[str, str],
+        dict[
+            tuple[packaging.version.Version, str, str],
+            dict[picopypi.build.Target, list[picopypi.build.Abi]],
+        ],
+    ] = {}
+    for info in build_infos:
+        build_passes = grouped.setdefault((info.package, info.repository), {})
+        passes = build_passes.setdefault(
+            (info.version, info.revision, info.lockfile), {}
         )
+        passes.setdefault(info.target, []).append(info.abi)
 
-    build_infos = sorted(build_infos, key=sort_key)
-    for (package, repository), group_infos in itertools.groupby(
-        build_infos,
-        key=build_group_key,
-    ):
+    for (package, repository), build_passes in sorted(grouped.items()):
         builds: list[Build] = []
-        for (version, revision, lockfile), build_infos in itertools.groupby(
-            group_infos,
-            key=build_key,
-        ):
-            passes: list[BuildPass] = []
-            for target, pass_infos in itertools.groupby(
-                build_infos,
-                key=pass_key,
-            ):
-                passes.append(
-                    BuildPass(
-                        target,
-                        sorted(info.abi for info in pass_infos),
-                        lockfile=lockfile,
-                    )
+        for (version, revision, lockfile), passes in sorted(build_passes.items()):
+            builds.append(
+                Build(
+                    version,
+                    revision,
+                    [
+                        BuildPass(target, sorted(abis), lockfile=lockfile)
+                        for target, abis in sorted(passes.items())
+                    ],
                 )
-
-            builds.append(Build(version, revision, passes))
+            )
 
         yield BuildGroup(package, repository, builds)
 
 
-@dataclasses.dataclass(slots=True)
-class BuildInfo:
+class BuildInfo(typing.NamedTuple):
     package: str
     repository: str
 
@@ -193,14 +227,10 @@ class BuildInfo:
 
 
 def gather_build_infos(
-    releases: collections.abc.Mapping[
-        str,
-        collections.abc.Iterable[picopypi.releases.Wheel],
-    ],
-    build_file: pathlib.Path,
+    wheels: collections.abc.Iterable[picopypi.releases.Wheel],
+    build_data: bytes,
 ):
-    with build_file.open("rb") as file:
-        data = tomllib.load(file)
+    data = tomllib.loads(build_data.decode())
 
     requirements = {}
     for requirement in data["requirements"]:
@@ -210,7 +240,6 @@ def gather_build_infos(
         ]
         requirements[key] = hashes
 
-    wheels = itertools.chain.from_iterable(releases.values())
     provided = expand_wheels(wheels)
 
     for builds in data["builds"]:
@@ -219,8 +248,8 @@ def gather_build_infos(
         for revision in builds["revisions"]:
             revision_hash = revision["revision"]
             version = packaging.version.parse(revision["version"])
-            targets = revision["targets"]
-            abis = revision["abis"]
+            targets = [picopypi.build.Target(target) for target in revision["targets"]]
+            abis = [picopypi.build.Abi(abi) for abi in revision["abis"]]
             requires = revision["requires"]
 
             locks = []
@@ -229,67 +258,66 @@ def gather_build_infos(
                 locks.append(" ".join((key, *requirements[key])))
             lockfile = "\n".join(locks)
 
-            for target, abi in itertools.product(targets, abis):
-                key = _SatisfactionKey(package, version, target)
-                abis = provided.get(key, ())
-                satisfied = abi in abis or (
+            desired = {
+                (package, version, target, abi)
+                for target, abi in itertools.product(targets, abis)
+            }
+            for _, _, target, abi in desired - provided:
+                if (
                     # The tag could be satisfied by `abi3`
                     abi.startswith("cp3")
                     and not abi.endswith(("t", "m"))
-                    and "abi3" in abis
+                    and (package, version, target, "abi3") in provided
+                ):
+                    continue
+
+                yield BuildInfo(
+                    package=package,
+                    version=version,
+                    repository=repository,
+                    revision=revision_hash,
+                    target=target,
+                    abi=abi,
+                    lockfile=lockfile,
                 )
 
-                if not satisfied:
-                    yield BuildInfo(
-                        package=package,
-                        version=version,
-                        repository=repository,
-                        revision=revision_hash,
-                        target=picopypi.build.Target(target),
-                        abi=picopypi.build.Abi(abi),
-                        lockfile=lockfile,
-                    )
 
+_PLATFORM_RE = re.compile(r"(?P<family>manylinux|musllinux|macosx).*_(?P<arch>[^_]+)")
 
-@dataclasses.dataclass(order=True, frozen=True, slots=True)
-class _SatisfactionKey:
-    package: str
-    version: packaging.version.Version
-    target: str
 
+def expand_wheels(wheels: collections.abc.Iterable[picopypi.releases.Wheel]):
+    # (package, version, target, abi)
+    result: set[tuple[str, packaging.version.Version, str, str]] = set()
 
-_PLATFORM_RE = re.compile(
-    "|".join(
-        [
-            "manylinux",
-            "musllinux",
-            "macosx",
-        ]
-    )
-)
+    for wheel in wheels:
+        for tag in wheel.tags:
+            target = _expand_platform(tag.platform)
+            result.add((wheel.package, wheel.version, target, tag.abi))
 
+    return frozenset(result)
 
-def expand_wheels(wheels: collections.abc.Iterable[picopypi.releases.Wheel]):
-    result: dict[_SatisfactionKey, set[str]] = collections.defaultdict(set)
 
-    # TODO(Grub4K): Expand this when more targets get added
+def supported_wheels(wheels: collections.abc.Iterable[picopypi.releases.Wheel]):
     for wheel in wheels:
-        for tag in wheel.tags:
-            match = _PLATFORM_RE.match(tag.platform)
-            if not match:
-                msg = f"Unhandled platform tag during expansion: {tag.platform}"
-                raise ValueError(msg)
-
-            key = _SatisfactionKey(
-                wheel.package,
-                wheel.version,
-                "_".join(
-                    (
-                        tag.platform[: match.end()],
-                        tag.platform.rpartition("_")[2],
-                    )
-                ),
-            )
-            result[key].add(tag.abi)
+        try:
+            for tag in wheel.tags:
+                _expand_platform(tag.platform)
+
+        except ValueError as error:
+            print(f"Skipping {wheel.name}: {error}", file=sys.stderr)
+            continue
+
+        else:
+            yield wheel
+
+
+# Platform tags repeat across almost every wheel, so only match each once
+@functools.cache
+def _expand_platform(platform: str):
+    # TODO(Grub4K): Expand this when more targets get added
+    match = _PLATFORM_RE.fullmatch(platform)
+    if not match:
+        msg = f"Unhandled platform tag during expansion: {platform}"
+        raise ValueError(msg)
 
-    return dict(result)
+    return f"{match['family']}_{match['arch']}"
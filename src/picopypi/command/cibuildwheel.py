@@ -9,11 +9,11 @@ In case emulation is required, Docker will be used.
 from __future__ import annotations
 
 import argparse
+import collections.abc
 import os
 import pathlib
-import random
+import secrets
 import shlex
-import string
 import subprocess
 import sys
 
@@ -86,38 +86,36 @@ def build(
     source: pathlib.Path,
     output: pathlib.Path,
     target: picopypi.build.Target,
-    abis: list[picopypi.build.Abi],
+    abis: collections.abc.Iterable[picopypi.build.Abi],
     lockfile: str | None = None,
 ):
     # TODO(Grub4K): Add ability to pass build arguments to builder
     args: list[str] = []
 
-    more = {}
+    env = os.environ.copy()
+    env["CIBW_PLATFORM"] = target.platform()
+    env["CIBW_ARCHS"] = target.arch()
+    env["CIBW_BUILD"] = " ".join(target.expand_configuration(abis))
+    env["CIBW_OUTPUT_DIR"] = str(output)
+    env["CIBW_MANYLINUX_ARMV7L_IMAGE"] = MANYLINUX_ARMV7L_IMAGE
+
     if lockfile is not None:
-        randkey = "".join(random.choices(string.hexdigits, k=20))
+        randkey = secrets.token_hex(10)
         file = f"/tmp/requirements-picopypi-{randkey}.txt"
-        more["CIBW_BEFORE_ALL"] = f"echo {shlex.quote(lockfile)} >{file}"
-        more["CIBW_BEFORE_BUILD"] = f"pip install --require-hashes --requirement {file}"
+        env["CIBW_BEFORE_ALL"] = f"echo {shlex.quote(lockfile)} >{file}"
+        env["CIBW_BEFORE_BUILD"] = f"pip install --require-hashes --requirement {file}"
         args.append("--no-isolation")
 
     build_frontend = "build"
     if args:
         build_frontend += f"; args: {shlex.join(args)}"
+    env["CIBW_BUILD_FRONTEND"] = build_frontend
 
     try:
         subprocess.check_call(
             ["cibuildwheel"],
             cwd=source,
-            env={
-                **os.environ,
-                "CIBW_PLATFORM": target.platform(),
-                "CIBW_ARCHS": target.arch(),
-                "CIBW_BUILD": " ".join(target.expand_configuration(abis)),
-                "CIBW_BUILD_FRONTEND": build_frontend,
-                "CIBW_OUTPUT_DIR": str(output),
-                "CIBW_MANYLINUX_ARMV7L_IMAGE": MANYLINUX_ARMV7L_IMAGE,
-                **more,
-            },
+            env=env,
         )
 
     except FileNotFoundError:
@@ -11,6 +11,7 @@ from __future__ import annotations
 import argparse
 import collections
 import collections.abc
+import concurrent.futures
 import html
 import pathlib
 import shutil
@@ -18,7 +19,7 @@ import shutil
 import picopypi.gitutil
 import picopypi.releases
 
-HTML_TEMPLATE = """\
+HTML_HEADER = """\
 <!DOCTYPE html>
 <html>
 <head>
@@ -27,21 +28,51 @@ HTML_TEMPLATE = """\
 <body>
   <h1>{title}</h1>
   <ul>
-{items}  </ul>
+"""
+HTML_FOOTER = """\
+  </ul>
 </body>
 </html>
 """
-FILE_TEMPLATE = """\
-    <li><a href="{href}#{sha}">
-      {name}
-    </a></li>
-"""
-PACKAGE_TEMPLATE = """\
-    <li>
-      <a href="{href}/">{name}</a>
-      <span> (latest: {latest})</span>
-    </li>
-"""
+
+
+def write_page(
+    path: pathlib.Path,
+    title: str,
+    items: collections.abc.Iterable[str],
+):
+    with path.open("w", encoding="utf-8", newline="\n") as file:
+        file.write(HTML_HEADER.format(title=html.escape(title)))
+        file.writelines(items)
+        file.write(HTML_FOOTER)
+
+
+def render_file_item(file: picopypi.releases.Wheel):
+    name = html.escape(file.name)
+    href = html.escape(file.url, quote=True)
+    sha = html.escape(file.hash, quote=True)
+    return f'    <li><a href="{href}#{sha}">\n      {name}\n    </a></li>\n'
+
+
+def render_package_item(package: str, latest: picopypi.releases.Wheel):
+    # `html.escape` quotes by default, so this is valid as both text and href
+    name = html.escape(package)
+    version = html.escape(str(latest.version), quote=True)
+    return (
+        "    <li>\n"
+        f'      <a href="{name}/">{name}</a>\n'
+        f"      <span> (latest: {version})</span>\n"
+        "    </li>\n"
+    )
+
+
+def write_package_index(
+    path: pathlib.Path,
+    package: str,
+    files: collections.abc.Iterable[picopypi.releases.Wheel],
+):
+    path.mkdir()
+    write_page(path / "index.html", package, map(render_file_item, files))
 
 
 def render_html(
@@ -51,43 +82,26 @@ def render_html(
     ],
     target: pathlib.Path,
 ):
-    packages = {name: sorted(packages[name]) for name in sorted(packages)}
+    entries = [
+        (package, picopypi.releases.sort_wheels(files))
+        for package, files in sorted(packages.items())
+    ]
 
     shutil.rmtree(target, ignore_errors=True)
-    for package, files in packages.items():
-        package_path = target / package
-        package_path.mkdir(parents=True)
-        (package_path / "index.html").write_text(
-            HTML_TEMPLATE.format(
-                title=html.escape(package),
-                items="".join(
-                    FILE_TEMPLATE.format(
-                        name=html.escape(file.name),
-                        href=html.escape(file.url, quote=True),
-                        sha=html.escape(file.hash, quote=True),
-                    )
-                    for file in files
-                ),
-            ),
-            encoding="utf-8",
-            newline="\n",
-        )
-
-    target.mkdir(parents=True, exist_ok=True)
-    (target / "index.html").write_text(
-        HTML_TEMPLATE.format(
-            title=html.escape("Available packages"),
-            items="".join(
-                PACKAGE_TEMPLATE.format(
-                    name=html.escape(package),
-                    href=html.escape(package, quote=True),
-                    latest=html.escape(str(files[0].version), quote=True),
-                )
-                for package, files in packages.items()
-            ),
-        ),
-        encoding="utf-8",
-        newline="\n",
+    target.mkdir(parents=True)
+    # Each package is written to its own directory, so the writes can overlap
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = [
+            executor.submit(write_package_index, target / package, package, files)
+            for package, files in entries
+        ]
+    for future in futures:
+        future.result()
+
+    write_page(
+        target / "index.html",
+        "Available packages",
+        (render_package_item(package, files[0]) for package, files in entries),
     )
 
 
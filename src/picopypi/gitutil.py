@@ -2,14 +2,13 @@ from __future__ import annotations
 
 import hashlib
 import pathlib
-import re
+import shutil
 import subprocess
 import sys
 
+# Resolve once so each of the many git invocations skips the `PATH` search
+GIT = shutil.which("git") or "git"
 ALLOWED_DIGEST_LENGTHS = (hashlib.sha1().digest_size, hashlib.sha256().digest_size)
-ALLOWED_DIGEST_RE = re.compile(
-    "|".join(rf"[0-9a-fA-F]{{{length * 2}}}" for length in ALLOWED_DIGEST_LENGTHS)
-)
 
 
 def repository(value: str):
@@ -22,7 +21,13 @@ def repository(value: str):
 
 
 def revision(value: str):
-    if not ALLOWED_DIGEST_RE.fullmatch(value):
+    try:
+        digest = bytes.fromhex(value)
+    except ValueError:
+        digest = b""
+
+    # `fromhex` skips whitespace, so make sure every character was a digit
+    if len(digest) not in ALLOWED_DIGEST_LENGTHS or len(value) != len(digest) * 2:
         msg = f"Invalid digest: {value!r}"
         raise ValueError(msg)
     return value
@@ -30,9 +35,13 @@ def revision(value: str):
 
 def infer_repository() -> str:
     try:
-        ref = _git(["symbolic-ref", "HEAD"])
-        remote = _git(["for-each-ref", "--format=%(push:remotename)", "--", ref])
-        return _git(["ls-remote", "--get-url", "--", remote])
+        # `%(HEAD)` marks the checked out branch, which saves resolving it first
+        refs = _git(
+            ["for-each-ref", "--format=%(HEAD)%(push:remotename)", "refs/heads/"]
+        )
+        for line in refs.splitlines():
+            if line.startswith("*"):
+                return _git(["ls-remote", "--get-url", "--", line[1:]])
     except subprocess.CalledProcessError:
         pass
 
@@ -46,7 +55,7 @@ def infer_repository() -> str:
 def checkout(path: pathlib.Path, revision: str):
     subprocess.check_call(
         [
-            "git",
+            GIT,
             "-C",
             str(path),
             "-c",
@@ -62,9 +71,19 @@ def clone_or_fetch(path: pathlib.Path, url: str):
 
     git_dir = path / repository
     if not git_dir.is_dir():
-        subprocess.check_call(["git", "-C", str(path), "clone", url])
+        subprocess.check_call(
+            [
+                GIT,
+                "-C",
+                str(path),
+                "clone",
+                "--filter=blob:none",
+                "--no-checkout",
+                url,
+            ]
+        )
     else:
-        subprocess.check_call(["git", "-C", str(git_dir), "fetch"])
+        subprocess.check_call([GIT, "-C", str(git_dir), "fetch"])
 
     return git_dir
 
@@ -78,4 +97,4 @@ def create_ignored_folder(path: pathlib.Path):
 
 
 def _git(args: list[str]):
-    return subprocess.check_output(["git", *args], text=True).removesuffix("\n")
+    return subprocess.check_output([GIT, *args], text=True).removesuffix("\n")
@@ -5,51 +5,44 @@ import collections.abc
 import contextlib
 import dataclasses
 import datetime as dt
+import functools
 import hashlib
+import http
 import json
+import operator
+import os
+import pathlib
 import re
 import sys
+import urllib.error
 import urllib.request
 
 import packaging.tags
 import packaging.utils
 
-REMOTE_RE = re.compile(r"(?:https://github\.com/|git@github\.com:)?(\w+/\w+)(?:\.git)?")
-
-
-class _InverseSorter:
-    def __init__(self, obj, /):
-        self.obj = obj
-
-    def __lt__(self, other, /):
-        if not isinstance(other, _InverseSorter):
-            return NotImplemented
-        return other.obj <= self.obj
-
-    def __eq__(self, other, /):
-        if not isinstance(other, _InverseSorter):
-            return NotImplemented
-        return other.obj == self.obj
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-    def __hash__(self, /):
-        return hash(self.obj)
-
-    def __repr__(self, /):
-        return f"<{type(self).__name__} of {self.obj!r}>"
+REMOTE_RE = re.compile(r"(?:https://github\.com/|git@github\.com:)?(\w+/\w+)(?:\.git)?")
+_INTERPRETER_VERSION_RE = re.compile(r"(?P<major>\d)(?P<minor>\d+)(?P<variant>.*)")
 
 
 def _sort_tag(tag: packaging.tags.Tag):
     interpreter = tag.interpreter[:2]
-    version = tag.interpreter[2:]
-    variant = ""
-    for index, char in enumerate(version):
-        if not char.isdecimal():
-            version = version[:index]
-            variant = version[index:]
-            break
+    match = _INTERPRETER_VERSION_RE.fullmatch(tag.interpreter, 2)
+    if not match:
+        msg = f"Invalid interpreter tag: {tag.interpreter!r}"
+        raise ValueError(msg)
+
+    major, minor = int(match["major"]), int(match["minor"])
+    return (interpreter, major, minor, match["variant"], tag.abi)
 
-    major, minor = int(version[0]), int(version[1:])
-    return (interpreter, major, minor, variant, tag.abi)
+
+@functools.cache
+def _sort_tags(tags: frozenset[packaging.tags.Tag]):
+    return tuple(sorted(set(map(_sort_tag, tags))))
 
 
 @dataclasses.dataclass
@@ -64,11 +57,7 @@ class Wheel:
     ):
         parsed = packaging.utils.parse_wheel_filename(self.name)
         self._package, self._version, _, self._tags = parsed
-        self._sort_key = (
-            self.package,
-            _InverseSorter(self.version),
-            tuple(sorted(set(map(_sort_tag, self._tags)))),
-        )
+        self._tags_key = _sort_tags(self._tags)
 
     @property
     def package(self, /):
@@ -82,10 +71,14 @@ class Wheel:
     def tags(self, /):
         return self._tags
 
-    def __lt__(self, other, /):
-        if not isinstance(other, type(self)):
-            return NotImplemented
-        return self._sort_key < other._sort_key
+
+def sort_wheels(wheels: collections.abc.Iterable[Wheel]):
+    # Sorting is stable, so sort by the least significant key first; this
+    # allows sorting versions descending while the others stay ascending
+    result = sorted(wheels, key=operator.attrgetter("_tags_key"))
+    result.sort(key=operator.attrgetter("version"), reverse=True)
+    result.sort(key=operator.attrgetter("package"))
+    return result
 
 
 def load_from_github_api(repository: str):
@@ -95,19 +88,78 @@ def load_from_github_api(repository: str):
         sys.exit(1)
 
     url = f"https://api.github.com/repos/{match.group(1)}/releases"
-    request = urllib.request.urlopen(
-        urllib.request.Request(
-            url,
-            headers={
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
-        )
-    )
+    body = _fetch_cached(url)
+    return parse(orjson.loads(body) if orjson else json.loads(body))
+
+
+def cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base, "picopypi")
+
+
+def _fetch_cached(url: str):
+    path = cache_dir() / "releases" / hashlib.sha256(url.encode()).hexdigest()
+    body_path = path.with_suffix(".json")
+    etag_path = path.with_suffix(".etag")
+
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+    if body_path.is_file():
+        with contextlib.suppress(OSError):
+            headers["If-None-Match"] = etag_path.read_text(encoding="utf-8")
+
+    try:
+        request = urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+    except urllib.error.HTTPError as error:
+        if error.code != http.HTTPStatus.NOT_MODIFIED:
+            raise
+        try:
+            return body_path.read_bytes()
+        except OSError:
+            # The cached body is gone, so request the full response instead
+            headers.pop("If-None-Match", None)
+            request = urllib.request.urlopen(
+                urllib.request.Request(url, headers=headers)
+            )
+
     with contextlib.closing(request) as file:
-        data = json.load(file)
+        etag = file.headers.get("ETag")
+        body = file.read()
+
+    # The cache is only an optimization, so failing to write it is not an error
+    if etag:
+        with contextlib.suppress(OSError):
+            # Remove the old ETag first so it can never refer to a partial body
+            path.parent.mkdir(parents=True, exist_ok=True)
+            etag_path.unlink(missing_ok=True)
+            body_path.write_bytes(body)
+            etag_path.write_text(etag, encoding="utf-8")
+
+    return body
 
-    return parse(data)
+
+def load_from_directory(path: pathlib.Path):
+    packages: dict[str, list[Wheel]] = collections.defaultdict(list)
+    for file in path.glob("*.whl"):
+        # Only the filename is needed, so the wheel is not read or hashed
+        try:
+            wheel = Wheel(
+                name=file.name,
+                url=file.as_uri(),
+                hash="",
+                datetime=dt.datetime.fromtimestamp(file.stat().st_mtime, dt.UTC),
+            )
+
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            continue
+
+        else:
+            packages[wheel.package].append(wheel)
+
+    return packages
 
 
 def parse(data) -> collections.abc.Mapping[str, collections.abc.Iterable[Wheel]]: